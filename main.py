@@ -1,17 +1,75 @@
 import os
 import time
 import shutil
-import json
-import concurrent.futures
-from datetime import datetime, timedelta
+import orjson
+import hashlib
+import argparse
+import atexit
+import logging
+import logging.handlers
+import queue
+import sys
+import asyncio
+from datetime import date, datetime, timedelta, timezone
+from urllib.parse import parse_qs, urlparse
 from osgeo import ogr, osr
+import pystac
 import pystac_client
 import planetary_computer as pc
+from planetary_computer.settings import Settings
+from planetary_computer.utils import parse_blob_url
 from collections import defaultdict
-import requests
-import shapely.geometry
+import aiohttp
+import aiofiles
+import numpy as np
+import shapely
+import shapely.ops
+
+log = logging.getLogger(__name__)
+
+# --- Download Settings ---
+# Concurrent tile downloads; lower S1DL_WORKERS if the server starts returning 429s
+try:
+    MAX_CONCURRENT_DOWNLOADS = int(os.environ.get("S1DL_WORKERS", "24"))
+except ValueError:
+    raise ValueError(f"S1DL_WORKERS must be an integer, got {os.environ['S1DL_WORKERS']!r}") from None
+if MAX_CONCURRENT_DOWNLOADS < 1:
+    raise ValueError(f"S1DL_WORKERS must be at least 1, got {MAX_CONCURRENT_DOWNLOADS}")
+# Per-socket timeouts; no total limit since full GRD tiles can be large
+DOWNLOAD_TIMEOUT = aiohttp.ClientTimeout(total=None, sock_connect=300, sock_read=300)
+# Write to disk in 1 MiB batches to keep per-write overhead low on large tiles
+CHUNK_SIZE = 1 << 20
+# Re-sign asset hrefs whose SAS token expires within this margin
+SIGN_REFRESH_MARGIN = timedelta(minutes=10)
+# Refreshed SAS tokens, keyed by (storage account, container)
+SAS_TOKENS = {}
+# Retries for rate limiting, server errors and dropped connections
+MAX_RETRIES = 6
+BACKOFF_FACTOR = 0.8
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# --- STAC Search Cache ---
+CACHE_DIR = os.path.expanduser("~/.cache/sentinel1-downloader")
+CACHE_TTL_SECONDS = 24 * 60 * 60
 
 # --- Helper Functions ---
+def setup_logging():
+    """Route log records through a queue so workers never block on stdout"""
+    # Leave logging alone if the caller already configured handlers
+    if log.hasHandlers():
+        return
+    
+    log_queue = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(logging.Formatter("%(message)s"))
+    listener = logging.handlers.QueueListener(log_queue, stream_handler)
+    
+    log.addHandler(logging.handlers.QueueHandler(log_queue))
+    log.setLevel(logging.INFO)
+    
+    listener.start()
+    atexit.register(listener.stop)
+
 def get_aoi_geometry_and_bbox(vector_file_path):
     """Get AOI geometry and bounding box in EPSG:4326"""
     # Open the vector file
@@ -32,122 +90,273 @@ def get_aoi_geometry_and_bbox(vector_file_path):
     if source_srs and not source_srs.IsSame(target_srs):
         transform = osr.CoordinateTransformation(source_srs, target_srs)
     
-    # Create a multi-polygon to store the union of all geometries
-    union_geom = ogr.Geometry(ogr.wkbMultiPolygon)
-    
-    # Process each feature
+    # Read each feature's geometry as WKB
+    wkbs = []
     for feature in layer:
-        geom = feature.GetGeometryRef().Clone()
+        geom = feature.GetGeometryRef()
         if geom is not None:
-            # Flatten 3D to 2D if needed
-            if geom.GetDimension() == 3:
-                geom.FlattenTo2D()
-            
-            # Transform to EPSG:4326 if needed
-            if transform:
-                geom.Transform(transform)
-            
-            # Add to union
-            union_geom = union_geom.Union(geom)
+            wkbs.append(bytes(geom.ExportToWkb()))
     
-    # Get bounding box in EPSG:4326
-    minx, maxx, miny, maxy = union_geom.GetEnvelope()
-    bbox = [minx, miny, maxx, maxy]
+    # Parse all features at once and flatten 3D to 2D
+    geoms = shapely.force_2d(shapely.from_wkb(wkbs))
+    
+    # Transform all vertices to EPSG:4326 in a single call if needed
+    if transform:
+        coords = shapely.get_coordinates(geoms)
+        if len(coords):
+            coords = np.array(transform.TransformPoints(coords.tolist()))[:, :2]
+            if not np.isfinite(coords).all():
+                raise ValueError(f"Could not transform all coordinates of {vector_file_path} to EPSG:4326")
+            geoms = shapely.set_coordinates(geoms, coords)
     
-    # Convert to Shapely geometry
-    geojson_str = union_geom.ExportToJson()
-    aoi_geometry = shapely.geometry.shape(json.loads(geojson_str))
+    # Union all features at once (cascaded union instead of pairwise)
+    aoi_geometry = shapely.ops.unary_union(geoms)
+    
+    # Get bounding box in EPSG:4326
+    bbox = list(aoi_geometry.bounds)
     
     # Clean up
-    union_geom = None
     ds = None
     
     return aoi_geometry, bbox
 
-def download_tile(item, band, output_dir):
+def retry_delay(attempt, retry_after=None):
+    """Exponential backoff delay, honouring a Retry-After header given in seconds"""
+    if retry_after and retry_after.isdigit():
+        return float(retry_after)
+    return BACKOFF_FACTOR * (2 ** attempt)
+
+async def fetch_to_file(session, url, output_path):
+    """Stream a URL to a local file, resuming from a previous partial download"""
+    # Data is written to a .part file and only renamed once complete; the
+    # ETag of the response that started it is kept alongside for If-Range
+    part_path = f"{output_path}.part"
+    etag_path = f"{part_path}.etag"
+    existing = os.path.getsize(part_path) if os.path.exists(part_path) else 0
+    etag = None
+    if existing and os.path.exists(etag_path):
+        with open(etag_path) as f:
+            etag = f.read().strip() or None
+    
+    headers = {"Accept-Encoding": "identity"}
+    if existing and etag:
+        # If-Range makes the server send the whole file if the blob has changed
+        headers["Range"] = f"bytes={existing}-"
+        headers["If-Range"] = etag
+    
+    async with session.get(url, headers=headers, timeout=DOWNLOAD_TIMEOUT) as r:
+        if r.status == 416:
+            # Partial file cannot be resumed, start over from scratch
+            discard_partial(part_path)
+            return await fetch_to_file(session, url, output_path)
+        r.raise_for_status()
+        
+        # Append only if the server resumed exactly where the partial file ends
+        resumed = "Range" in headers and r.status == 206
+        if resumed and not r.headers.get("Content-Range", "").startswith(f"bytes {existing}-"):
+            discard_partial(part_path)
+            raise aiohttp.ClientPayloadError(
+                f"Unexpected Content-Range {r.headers.get('Content-Range')!r} for resume at {existing}"
+            )
+        if not resumed:
+            if r.status != 200:
+                discard_partial(part_path)
+                raise aiohttp.ClientPayloadError(f"Unexpected HTTP {r.status} for a full download")
+            
+            # Remember the validator for this download, only strong ETags work with If-Range
+            new_etag = r.headers.get("ETag")
+            if new_etag and not new_etag.startswith("W/"):
+                with open(etag_path, "w") as f:
+                    f.write(new_etag)
+            elif os.path.exists(etag_path):
+                os.remove(etag_path)
+        
+        # Socket reads return at most what is buffered (~256 KiB), so
+        # accumulate up to CHUNK_SIZE before each file write
+        async with aiofiles.open(part_path, 'ab' if resumed else 'wb') as f:
+            buffer = bytearray()
+            try:
+                async for chunk in r.content.iter_any():
+                    buffer += chunk
+                    if len(buffer) >= CHUNK_SIZE:
+                        await f.write(buffer)
+                        buffer.clear()
+            finally:
+                # Keep everything received so far for a later resume
+                if buffer:
+                    await f.write(buffer)
+    
+    os.replace(part_path, output_path)
+    if os.path.exists(etag_path):
+        os.remove(etag_path)
+
+def discard_partial(part_path):
+    """Remove a partial download and its stored ETag"""
+    for path in (part_path, f"{part_path}.etag"):
+        if os.path.exists(path):
+            os.remove(path)
+
+def fetch_sas_token(account, container):
+    """Fetch a new SAS token for a container, bypassing the library's token cache"""
+    # planetary_computer only refreshes cached tokens in their last minute,
+    # so evict the entry to get a token with its full lifetime
+    token_url = f"{Settings.get().sas_url}/{account}/{container}"
+    pc.sas.TOKEN_CACHE.pop(token_url, None)
+    return pc.sas.get_token(account, container)
+
+async def fresh_href(href, token_lock):
+    """Return a signed href, re-signing it if its SAS token is about to expire"""
+    expiry = parse_qs(urlparse(href).query).get("se")
+    if expiry:
+        expires_at = datetime.fromisoformat(expiry[0].replace("Z", "+00:00"))
+        if expires_at - datetime.now(timezone.utc) > SIGN_REFRESH_MARGIN:
+            return href
+    
+    bare_href = href.split("?", 1)[0]
+    parsed_url = urlparse(bare_href)
+    if not parsed_url.netloc.endswith(pc.sas.BLOB_STORAGE_DOMAIN):
+        return href
+    
+    # Refresh once per container; tasks queued on the lock reuse the new token
+    key = parse_blob_url(parsed_url)
+    async with token_lock:
+        token = SAS_TOKENS.get(key)
+        if token is None or token.ttl() < SIGN_REFRESH_MARGIN.total_seconds():
+            token = await asyncio.to_thread(fetch_sas_token, *key)
+            SAS_TOKENS[key] = token
+    
+    return token.sign(bare_href).href
+
+def tile_filename(item, band):
+    """Local filename for an item's band"""
+    return f"{item.id}_{band}.tif".replace("/", "_")
+
+def is_downloaded(output_path):
+    """Check if a tile has already been fully downloaded"""
+    return os.path.exists(output_path) and os.path.getsize(output_path) > 1024
+
+async def download_tile(session, sem, token_lock, item, band, output_dir):
     """Download full tile without processing"""
     try:
+        # Assets were signed when the search results were loaded
         asset = item.assets[band]
-        signed_url = pc.sign(asset.href)
-        filename = f"{item.id}_{band}.tif".replace("/", "_")
+        filename = tile_filename(item, band)
         output_path = os.path.join(output_dir, filename)
         
-        # Skip if file already exists
-        if os.path.exists(output_path):
-            print(f"File exists, skipping: {filename}")
-            return output_path
-        
-        print(f"Downloading {filename}")
-        
-        # Download using requests with streaming
-        with requests.get(signed_url, stream=True, timeout=300) as r:
-            r.raise_for_status()
-            with open(output_path, 'wb') as f:
-                for chunk in r.iter_content(chunk_size=8192 * 8):
-                    f.write(chunk)
+        # Download using the shared session, retrying transient failures
+        for attempt in range(MAX_RETRIES + 1):
+            try:
+                async with sem:
+                    log.info("Downloading %s", filename)
+                    # Long runs can outlive the token, so check it before each request
+                    asset.href = await fresh_href(asset.href, token_lock)
+                    await fetch_to_file(session, asset.href, output_path)
+                break
+            except aiohttp.ClientResponseError as e:
+                if e.status not in RETRY_STATUSES or attempt == MAX_RETRIES:
+                    raise
+                delay = retry_delay(attempt, e.headers.get("Retry-After") if e.headers else None)
+                log.warning("HTTP %d for %s, retrying in %.1fs", e.status, filename, delay)
+            except (aiohttp.ClientPayloadError, aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+                if attempt == MAX_RETRIES:
+                    raise
+                delay = retry_delay(attempt)
+                log.warning("Connection lost for %s (%r), resuming in %.1fs", filename, e, delay)
+            
+            # Back off outside the semaphore so other downloads can proceed
+            await asyncio.sleep(delay)
         
         # Verify file size
         if os.path.getsize(output_path) > 1024:
-            print(f"Downloaded {filename} ({os.path.getsize(output_path)//1024} KB)")
+            log.info("Downloaded %s (%d KB)", filename, os.path.getsize(output_path) >> 10)
             return output_path
         else:
             os.remove(output_path)
-            print(f"File too small, deleted: {filename}")
+            log.warning("File too small, deleted: %s", filename)
             return None
     except Exception as e:
-        print(f"Error downloading {item.id} ({band}): {e}")
+        log.error("Error downloading %s (%s): %s", item.id, band, e)
         return None
 
-def item_intersects_aoi(item, aoi_geometry):
-    """Check if an item intersects with the AOI geometry"""
-    try:
-        # Get item geometry as Shapely object
-        item_geom = shapely.geometry.shape(item.geometry)
-        return aoi_geometry.intersects(item_geom)
-    except Exception as e:
-        print(f"Error checking intersection for {item.id}: {e}")
-        return False
+def items_intersecting_aoi(items, aoi_geometry):
+    """Return the items whose footprints intersect the AOI geometry"""
+    # Parse all item footprints into a geometry array in one call
+    item_geoms = shapely.from_geojson(
+        [orjson.dumps(item.geometry) for item in items], on_invalid="warn"
+    )
+    
+    # Prepare the (complex) AOI once so each test against it is indexed
+    shapely.prepare(aoi_geometry)
+    mask = shapely.intersects(aoi_geometry, item_geoms)
+    
+    return [item for item, hit in zip(items, mask) if hit]
 
-# --- Main Processing Function ---
-def download_sentinel1_tiles(shapefile_path, start_date, end_date, base_folder, state_name):
-    # Load AOI geometry and bbox
-    try:
-        aoi_geometry, bbox = get_aoi_geometry_and_bbox(shapefile_path)
-        print(f"Loaded AOI geometry with bbox (EPSG:4326): {bbox}")
-    except Exception as e:
-        print(f"Error loading AOI: {e}")
-        return
+async def download_jobs(jobs):
+    """Download all (cycle, item, band, output_dir) jobs concurrently"""
+    sem = asyncio.Semaphore(MAX_CONCURRENT_DOWNLOADS)
+    token_lock = asyncio.Lock()
+    connector = aiohttp.TCPConnector(
+        limit=MAX_CONCURRENT_DOWNLOADS * 2,
+        limit_per_host=MAX_CONCURRENT_DOWNLOADS,
+    )
+    
+    async with aiohttp.ClientSession(connector=connector) as session:
+        tasks = [
+            download_tile(session, sem, token_lock, item, band, output_dir)
+            for _, item, band, output_dir in jobs
+        ]
+        return await asyncio.gather(*tasks, return_exceptions=True)
 
-    # Setup directories
-    os.makedirs(base_folder, exist_ok=True)
+def search_items(catalog, search_params, use_cache=True):
+    """Run a STAC search, reusing a cached result younger than the TTL"""
+    key = hashlib.sha256(orjson.dumps(search_params, option=orjson.OPT_SORT_KEYS)).hexdigest()
+    cache_path = os.path.join(CACHE_DIR, f"{key}.json")
     
-    # Connect to Planetary Computer
-    catalog = pystac_client.Client.open(
-        "https://planetarycomputer.microsoft.com/api/stac/v1",
-        modifier=pc.sign_inplace,
-    )
+    # Cache problems fall through to a live search; only search errors propagate
+    items = None
+    if use_cache:
+        try:
+            if time.time() - os.path.getmtime(cache_path) < CACHE_TTL_SECONDS:
+                with open(cache_path, "rb") as f:
+                    items = pystac.ItemCollection.from_dict(orjson.loads(f.read()))
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            log.warning("Ignoring unreadable search cache entry %s: %s", cache_path, e)
+    
+    if items is None:
+        items = catalog.search(**search_params).item_collection()
+        
+        # Write atomically so an interrupted run never leaves a corrupt entry
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            with open(tmp_path, "wb") as f:
+                f.write(orjson.dumps(items.to_dict()))
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            log.warning("Could not write search cache entry %s: %s", cache_path, e)
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+    
+    # Sign after caching so cached hrefs never carry expired SAS tokens
+    pc.sign_inplace(items)
+    return items
 
-    # Search using bbox instead of geometry
+def do_searches(catalog, spatial_filter, start_date, end_date, chunk_size_days, use_cache=True):
+    """Search the catalog in date chunks, raising if any chunk fails"""
     all_items = []
-    date_ranges = []
-    current_date = datetime.strptime(start_date, "%Y-%m-%d")
-    end_dt = datetime.strptime(end_date, "%Y-%m-%d")
-    
-    # Create date chunks for searching
-    chunk_size_days = 24  # Days per chunk
-    while current_date <= end_dt:
-        chunk_end = min(current_date + timedelta(days=chunk_size_days), end_dt)
-        date_range = f"{current_date.strftime('%Y-%m-%d')}/{chunk_end.strftime('%Y-%m-%d')}"
-        date_ranges.append(date_range)
-        current_date = chunk_end + timedelta(days=1)
+    current_date = date.fromisoformat(start_date)
+    end_day = date.fromisoformat(end_date)
     
-    # Search in chunks
-    for date_range in date_ranges:
-        print(f"Searching STAC catalog for {date_range}...")
+    while current_date <= end_day:
+        chunk_end = min(current_date + timedelta(days=chunk_size_days), end_day)
+        date_range = f"{current_date.isoformat()}/{chunk_end.isoformat()}"
+        log.info("Searching STAC catalog for %s...", date_range)
         
         search_params = {
             "collections": ["sentinel-1-grd"],
-            "bbox": bbox,
+            **spatial_filter,
             "datetime": date_range,
             "query": {
                 "sat:orbit_state": {"eq": "descending"},
@@ -157,76 +366,109 @@ def download_sentinel1_tiles(shapefile_path, start_date, end_date, base_folder,
         }
         
         try:
-            search = catalog.search(**search_params)
-            items = search.item_collection()
-            print(f"Found {len(items)} items for {date_range}")
-            all_items.extend(items)
+            items = search_items(catalog, search_params, use_cache=use_cache)
         except Exception as e:
-            print(f"STAC search failed for {date_range}: {e}")
-            # Try with smaller chunk if failed
-            if chunk_size_days > 7:
-                print("Reducing chunk size and retrying...")
-                chunk_size_days = max(7, chunk_size_days // 2)
-                current_date = datetime.strptime(start_date, "%Y-%m-%d")
-                date_ranges = []
-                while current_date <= end_dt:
-                    chunk_end = min(current_date + timedelta(days=chunk_size_days), end_dt)
-                    date_range = f"{current_date.strftime('%Y-%m-%d')}/{chunk_end.strftime('%Y-%m-%d')}"
-                    date_ranges.append(date_range)
-                    current_date = chunk_end + timedelta(days=1)
-                continue
+            log.warning("STAC search failed for %s: %s", date_range, e)
+            raise
+        
+        log.info("Found %d items for %s", len(items), date_range)
+        all_items.extend(items)
+        current_date = chunk_end + timedelta(days=1)
+    
+    return all_items
+
+# --- Main Processing Function ---
+def download_sentinel1_tiles(shapefile_path, start_date, end_date, base_folder, state_name, use_cache=True):
+    setup_logging()
+    
+    # Load AOI geometry and bbox
+    try:
+        aoi_geometry, bbox = get_aoi_geometry_and_bbox(shapefile_path)
+        log.info("Loaded AOI geometry with bbox (EPSG:4326): %s", bbox)
+    except Exception as e:
+        log.error("Error loading AOI: %s", e)
+        return
+
+    # Setup directories
+    os.makedirs(base_folder, exist_ok=True)
+    
+    # Connect to Planetary Computer
+    # Items are signed in search_items() so cached results stay unsigned
+    catalog = pystac_client.Client.open(
+        "https://planetarycomputer.microsoft.com/api/stac/v1",
+    )
+
+    # Search using bbox instead of geometry, restarting the whole search
+    # with smaller date chunks if any chunk fails
+    chunk_size_days = 24  # Days per chunk
+    while True:
+        try:
+            all_items = do_searches(catalog, {"bbox": bbox}, start_date, end_date,
+                                    chunk_size_days, use_cache=use_cache)
+            break
+        except Exception:
+            if chunk_size_days <= 7:
+                log.error("STAC search failed at the minimum chunk size. Exiting.")
+                return
+            chunk_size_days = max(7, chunk_size_days // 2)
+            log.info("Reducing chunk size to %d days and retrying...", chunk_size_days)
     
     if not all_items:
-        print("No items found. Exiting.")
+        log.info("No items found. Exiting.")
         return
     
-    print(f"Total items found in bbox: {len(all_items)}")
+    log.info("Total items found in bbox: %d", len(all_items))
     
     # Filter items by actual geometry intersection
-    filtered_items = []
-    for item in all_items:
-        if item_intersects_aoi(item, aoi_geometry):
-            filtered_items.append(item)
+    filtered_items = items_intersecting_aoi(all_items, aoi_geometry)
     
-    print(f"Items intersecting with AOI: {len(filtered_items)}")
+    log.info("Items intersecting with AOI: %d", len(filtered_items))
     
     # Exit if no items found after filtering
     if not filtered_items:
-        print("No intersecting items found. Exiting.")
+        log.info("No intersecting items found. Exiting.")
         return
 
-    # Group items by acquisition date
-    items_by_date = defaultdict(list)
-    for item in filtered_items:
-        date_str = datetime.strptime(item.properties["datetime"], "%Y-%m-%dT%H:%M:%S.%fZ").strftime("%Y-%m-%d")
-        items_by_date[date_str].append(item)
-    
-    # Create 12-day processing cycles
-    cycle_dates = []
-    current = datetime.strptime(start_date, "%Y-%m-%d")
-    end_dt = datetime.strptime(end_date, "%Y-%m-%d")
-    
-    while current <= end_dt:
-        cycle_dates.append(current.strftime("%Y-%m-%d"))
+    # Sort items by acquisition date (day ordinal)
+    # STAC datetimes are ISO-8601, so the date is always the first 10 characters
+    dated_items = sorted(
+        ((date.fromisoformat(item.properties["datetime"][:10]).toordinal(), item) for item in filtered_items),
+        key=lambda pair: pair[0],
+    )
+    
+    # Create 12-day processing cycles with precomputed ordinal bounds
+    cycles = []
+    current = date.fromisoformat(start_date)
+    end_day = date.fromisoformat(end_date)
+    
+    while current <= end_day:
+        cycle_end = current + timedelta(days=11)
+        cycles.append((current.isoformat(), cycle_end.isoformat(), current.toordinal(), cycle_end.toordinal()))
         current += timedelta(days=12)
     
-    # Process each cycle
-    for cycle_start in cycle_dates:
-        cycle_start_dt = datetime.strptime(cycle_start, "%Y-%m-%d")
-        cycle_end_dt = cycle_start_dt + timedelta(days=11)
-        print(f"\nProcessing cycle: {cycle_start} to {cycle_end_dt.strftime('%Y-%m-%d')}")
+    # Build download jobs for every cycle, sweeping through the sorted items once
+    jobs = []
+    cycle_names = []
+    skipped_counts = defaultdict(int)
+    item_idx = 0
+    for cycle_start, cycle_end, start_ordinal, end_ordinal in cycles:
+        # Skip items dated before this cycle
+        while item_idx < len(dated_items) and dated_items[item_idx][0] < start_ordinal:
+            item_idx += 1
         
         # Collect items for this cycle
         cycle_items = []
-        for date, items_list in items_by_date.items():
-            date_dt = datetime.strptime(date, "%Y-%m-%d")
-            if cycle_start_dt <= date_dt <= cycle_end_dt:
-                cycle_items.extend(items_list)
+        while item_idx < len(dated_items) and dated_items[item_idx][0] <= end_ordinal:
+            cycle_items.append(dated_items[item_idx][1])
+            item_idx += 1
         
         if not cycle_items:
-            print("No items in this cycle. Skipping.")
+            log.info("No items in cycle %s to %s. Skipping.", cycle_start, cycle_end)
             continue
-            
+        
+        log.info("Cycle %s to %s: %d items", cycle_start, cycle_end, len(cycle_items))
+        cycle_names.append(cycle_start)
+        
         cycle_folder = os.path.join(base_folder, f"{cycle_start}_cycle")
         os.makedirs(cycle_folder, exist_ok=True)
         
@@ -236,34 +478,41 @@ def download_sentinel1_tiles(shapefile_path, start_date, end_date, base_folder,
         os.makedirs(vv_dir, exist_ok=True)
         os.makedirs(vh_dir, exist_ok=True)
         
-        # Download all tiles in parallel
-        with concurrent.futures.ThreadPoolExecutor(max_workers=5) as executor:
-            futures = []
-            
-            for item in cycle_items:
-                for band in ["vv", "vh"]:
-                    if band in item.assets:
-                        output_dir = vv_dir if band == "vv" else vh_dir
-                        futures.append(executor.submit(download_tile, item, band, output_dir))
-            
-            # Track results
-            success_count = 0
-            failure_count = 0
-            
-            for future in concurrent.futures.as_completed(futures):
-                try:
-                    result = future.result()
-                    if result:
-                        success_count += 1
-                    else:
-                        failure_count += 1
-                except Exception as e:
-                    failure_count += 1
-                    print(f"Error in download: {e}")
-            
-            print(f"Download summary: {success_count} successful, {failure_count} failed")
+        for item in cycle_items:
+            for band in ["vv", "vh"]:
+                if band in item.assets:
+                    output_dir = vv_dir if band == "vv" else vh_dir
+                    
+                    # Skip tiles already on disk before scheduling any work
+                    if is_downloaded(os.path.join(output_dir, tile_filename(item, band))):
+                        skipped_counts[cycle_start] += 1
+                        continue
+                    
+                    jobs.append((cycle_start, item, band, output_dir))
     
-    print("\nDownload completed successfully!")
+    # Download all tiles across all cycles in a single run
+    log.info("\nDownloading %d tiles (%d already downloaded)...", len(jobs), sum(skipped_counts.values()))
+    results = asyncio.run(download_jobs(jobs))
+    
+    # Track results per cycle
+    success_counts = defaultdict(int)
+    failure_counts = defaultdict(int)
+    
+    for (cycle_start, *_), result in zip(jobs, results):
+        if isinstance(result, Exception):
+            failure_counts[cycle_start] += 1
+            log.error("Error in download: %s", result)
+        elif result:
+            success_counts[cycle_start] += 1
+        else:
+            failure_counts[cycle_start] += 1
+    
+    log.info("\nDownload summary:")
+    for cycle_start in cycle_names:
+        log.info("  %s_cycle: %d successful, %d failed, %d skipped", cycle_start,
+                 success_counts[cycle_start], failure_counts[cycle_start], skipped_counts[cycle_start])
+    
+    log.info("\nDownload completed successfully!")
 
 if __name__ == "__main__":
     # ===== USER CONFIGURATION =====
@@ -275,10 +524,16 @@ if __name__ == "__main__":
     BASE_FOLDER = f"data/{STATE_NAME}/{SOURCE}"
     # ==============================
     
+    parser = argparse.ArgumentParser(description="Download Sentinel-1 GRD tiles from Planetary Computer")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="ignore cached STAC search results and query the catalog again")
+    args = parser.parse_args()
+    
     download_sentinel1_tiles(
         shapefile_path=SHAPEFILE_PATH,
         start_date=START_DATE,
         end_date=END_DATE,
         base_folder=BASE_FOLDER,
-        state_name=STATE_NAME
+        state_name=STATE_NAME,
+        use_cache=not args.no_cache
     )
\ No newline at end of file